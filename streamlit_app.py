@@ -5,11 +5,14 @@ This app displays real-time sensor data with auto-refreshing charts.
 """
 
 import streamlit as st
+from streamlit_autorefresh import st_autorefresh
 import sqlite3
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import os
 import time
 from datetime import datetime, timedelta
 
@@ -21,93 +24,271 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def get_database_connection():
-    """Get connection to SQLite database."""
+# Default auto-refresh period; also used as the TTL for cached queries so a
+# rerun inside one refresh window reuses the cached result instead of
+# re-querying SQLite.
+REFRESH_INTERVAL = 5
+
+# One module serves both deployments; schema-specific bits live here and
+# are selected with the INSTARHO_SCHEMA environment variable.
+# ts_kind 'unix' = integer Unix seconds, 'text' = ISO-8601 text.
+SCHEMAS = {
+    'rhodamine': {
+        'db': 'C:/Users/CSL 2/Documents/LOCNESS_data/database/locness.db',
+        'table': 'rhodamine',
+        'value_col': 'rho_ppb',
+        'ts_col': 'datetime_utc',
+        'ts_kind': 'unix',
+    },
+    'sensor_data': {
+        'db': 'streaming_data.db',
+        'table': 'sensor_data',
+        'value_col': 'temperature',
+        'ts_col': 'timestamp',
+        'ts_kind': 'text',
+    },
+}
+
+SCHEMA = SCHEMAS[os.environ.get('INSTARHO_SCHEMA', 'rhodamine')]
+DATABASE_PATH = SCHEMA['db']
+
+def _configure_conn(conn):
+    """Apply performance PRAGMAs to a reader connection.
+
+    The writer switches the database to WAL mode; here we only tune the
+    read side (a read-only connection cannot change the journal mode).
+    """
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=memory")
+    # Memory-map up to 256 MB of the file so repeated scans of hot pages
+    # (the timestamp index especially) are pointer loads, not pread
+    # syscalls; safe here because the connection is mode=ro
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+
+@st.cache_resource
+def _open_reader():
+    """Open the shared read-only connection to the SQLite database.
+
+    Cached as a resource so every rerun (and every session) reuses one
+    connection with a warm page cache instead of paying open/close per
+    query. Failures raise out of here — cache_resource doesn't cache
+    exceptions, so the next rerun retries the connect.
+    """
+    # mode=ro guarantees the dashboard can never take a write lock
+    conn = sqlite3.connect(f'file:{DATABASE_PATH}?mode=ro', uri=True,
+                           isolation_level=None,
+                           check_same_thread=False,
+                           cached_statements=256)
+    _configure_conn(conn)
+    return conn
+
+def get_reader():
+    """Get the shared reader connection, or None if connecting failed."""
     try:
-        conn = sqlite3.connect('C:/Users/CSL 2/Documents/LOCNESS_data/database/locness.db')
-        return conn
+        return _open_reader()
     except sqlite3.Error as e:
         st.error(f"Database error: {e}")
         return None
 
+def _window_cutoff(hours_back):
+    """Lower bound for the time window, in the schema's timestamp type."""
+    if SCHEMA['ts_kind'] == 'unix':
+        return int(time.time() - hours_back * 3600)
+    return (datetime.now() - timedelta(hours=hours_back)).strftime(
+        '%Y-%m-%d %H:%M:%S')
+
+@st.cache_data(ttl=REFRESH_INTERVAL, show_spinner=False)
 def load_data(hours_back=24, limit=1000):
     """Load data from the database."""
-    conn = get_database_connection()
+    conn = get_reader()
     if conn is None:
         return pd.DataFrame()
-    
+
     try:
-        # Query to get recent data (assuming timestamp is stored as Unix integer seconds)
+        # Compute the cutoff here and bind it, so one query text (and one
+        # compiled plan) serves every slider combination
+        cutoff = _window_cutoff(hours_back)
         query = f"""
-        SELECT rho_ppb, datetime_utc AS timestamp
-        FROM rhodamine
-        WHERE timestamp >= strftime('%s', 'now', '-{hours_back} hours')
-        ORDER BY timestamp DESC
-        LIMIT {limit}
+        SELECT {SCHEMA['value_col']}, {SCHEMA['ts_col']}
+        FROM {SCHEMA['table']}
+        WHERE {SCHEMA['ts_col']} >= ?
+        ORDER BY {SCHEMA['ts_col']} DESC
+        LIMIT ?
         """
-        df = pd.read_sql_query(query, conn)
-        if not df.empty:
-            # Convert Unix integer seconds to datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-            df = df.sort_values('timestamp')
-        conn.close()
-        return df
+        # Two narrow columns: build typed arrays straight from the cursor
+        # rows, skipping read_sql_query's object arrays and dtype
+        # inference entirely; float32 halves the bytes carried through
+        # to plotting
+        rows = conn.execute(query, (cutoff, limit)).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=['value', 'timestamp'])
+        n = len(rows)
+        value = np.fromiter((r[0] for r in rows), dtype=np.float32, count=n)
+        if SCHEMA['ts_kind'] == 'unix':
+            ts = np.fromiter((r[1] for r in rows), dtype=np.int64, count=n)
+            timestamps = pd.to_datetime(ts[::-1], unit='s', utc=True)
+        else:
+            # format='mixed': rows written via parameter binding carry
+            # microseconds while DEFAULT CURRENT_TIMESTAMP rows don't,
+            # so one fixed format can't parse both
+            timestamps = pd.to_datetime([r[1] for r in rows][::-1],
+                                        format='mixed')
+        # Rows arrive ORDER BY ... DESC, so reversing is enough —
+        # no need for a full sort
+        return pd.DataFrame({
+            'value': value[::-1],
+            'timestamp': timestamps
+        })
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        conn.close()
         return pd.DataFrame()
 
+@st.cache_data(ttl=REFRESH_INTERVAL, show_spinner=False)
+def load_stats(hours_back=24):
+    """Get summary statistics for the selected window.
+
+    Aggregated in SQL so only four scalars cross into Python instead of
+    every row in the window.
+    """
+    conn = get_reader()
+    if conn is None:
+        return None
+
+    try:
+        cutoff = _window_cutoff(hours_back)
+        col = SCHEMA['value_col']
+        query = f"""
+        SELECT COUNT({col}), AVG({col}), MIN({col}), MAX({col})
+        FROM {SCHEMA['table']}
+        WHERE {SCHEMA['ts_col']} >= ?
+        """
+        count, mean, minimum, maximum = conn.execute(query, (cutoff,)).fetchone()
+        if not count:
+            return None
+        return {
+            'count': count,
+            'mean': mean,
+            'min': minimum,
+            'max': maximum
+        }
+    except Exception as e:
+        st.error(f"Error loading statistics: {e}")
+        return None
+
+@st.cache_data(ttl=1, show_spinner=False)
 def get_latest_values():
     """Get the most recent sensor values."""
-    conn = get_database_connection()
+    conn = get_reader()
     if conn is None:
         return None
-    
+
     try:
-        query = """
-        SELECT rho_ppb, datetime_utc AS timestamp
-        FROM rhodamine
-        ORDER BY timestamp DESC
+        # Let SQLite format Unix seconds into display text; text
+        # timestamps are already readable as stored
+        if SCHEMA['ts_kind'] == 'unix':
+            ts_expr = (f"strftime('%Y-%m-%d %H:%M:%S', "
+                       f"{SCHEMA['ts_col']}, 'unixepoch')")
+        else:
+            ts_expr = SCHEMA['ts_col']
+        query = f"""
+        SELECT {SCHEMA['value_col']}, {ts_expr}
+        FROM {SCHEMA['table']}
+        ORDER BY {SCHEMA['ts_col']} DESC
         LIMIT 1
         """
-        cursor = conn.cursor()
-        cursor.execute(query)
-        result = cursor.fetchone()
-        conn.close()
+        result = conn.execute(query).fetchone()
         if result:
-            # Convert Unix integer seconds to readable datetime
-            readable_time = datetime.fromtimestamp(result[1]).strftime('%Y-%m-%d %H:%M:%S')
             return {
-                'rho_ppb': result[0],
-                'timestamp': readable_time
+                'value': result[0],
+                'timestamp': result[1]
             }
         return None
     except Exception as e:
         st.error(f"Error getting latest values: {e}")
-        conn.close()
         return None
 
+# Cap on points handed to Plotly; everything above is LTTB-downsampled
+MAX_PLOT_POINTS = 500
+
+def _lttb_downsample(df, n_out=MAX_PLOT_POINTS):
+    """Downsample to n_out points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last rows and, per bucket, the point forming the
+    largest triangle with the previously kept point and the next
+    bucket's average — preserving the visual shape of the series while
+    shipping ~10x fewer points to the browser.
+    """
+    n = len(df)
+    if n <= n_out:
+        return df
+
+    # astype through pandas: tz-aware columns come out of to_numpy() as
+    # object arrays of Timestamps, which ndarray.astype('int64') rejects
+    x = df['timestamp'].astype('int64').to_numpy().astype('float64')
+    y = df['value'].to_numpy().astype('float64')
+
+    # Bucket edges over the interior points; endpoints are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nhi = edges[i + 2] if i + 2 < n_out - 1 else n
+        avg_x = x[hi:nhi].mean()
+        avg_y = y[hi:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+
+    return df.iloc[keep]
+
+def _df_fingerprint(d):
+    """Cheap cache key for the plotted DataFrame.
+
+    Length plus the newest timestamp/value uniquely identify a refresh
+    window for append-only data, so figures are only rebuilt when new
+    rows have actually arrived.
+    """
+    if len(d) == 0:
+        return (0,)
+    return (len(d), d['timestamp'].iloc[-1].value, float(d['value'].iloc[-1]))
+
+@st.cache_data(ttl=60, show_spinner=False,
+               hash_funcs={pd.DataFrame: _df_fingerprint})
 def create_time_series_chart(df):
-    """Create a time series chart for rho_ppb vs timestamp."""
+    """Create a time series chart for the value column vs timestamp."""
     if df.empty:
         return None
+    value_col = SCHEMA['value_col']
+    # Individual markers dominate render time at high point counts;
+    # judge by the raw window size before downsampling caps it at
+    # MAX_PLOT_POINTS, otherwise the threshold can never trip
+    mode = 'lines' if len(df) > 500 else 'lines+markers'
+    df = _lttb_downsample(df)
     fig = go.Figure()
     fig.add_trace(
-        go.Scatter(x=df['timestamp'], y=df['rho_ppb'],
-                   mode='lines+markers', name='rho_ppb',
-                   line=dict(color='#4ecdc4', width=2),
-                   marker=dict(size=4))
+        go.Scattergl(x=df['timestamp'], y=df['value'],
+                     mode=mode, name=value_col,
+                     line=dict(color='#4ecdc4', width=2),
+                     marker=dict(size=4))
     )
     fig.update_layout(
         height=500,
         showlegend=True,
-        title_text="rho_ppb vs Timestamp",
+        title_text=f"{value_col} vs Timestamp",
         title_x=0.5,
         xaxis_title="Time",
-        yaxis_title="rho_ppb"
+        yaxis_title=value_col
     )
     return fig
 
+@st.cache_data(ttl=60, show_spinner=False)
 def create_gauge_charts(latest_values):
     """Create gauge charts for current values."""
     if not latest_values:
@@ -220,17 +401,24 @@ def main():
             "Refresh interval (seconds)",
             min_value=1,
             max_value=30,
-            value=5
+            value=REFRESH_INTERVAL
         )
+        # Client-side timer triggers the rerun; no busy-waiting in the
+        # script thread
+        st_autorefresh(interval=refresh_interval * 1000, key='datarefresh')
     
     # Manual refresh button
     if st.sidebar.button("🔄 Refresh Now"):
         st.rerun()
+
+    # Drop cached query results so the next rerun hits the database
+    if st.sidebar.button("🗑️ Clear cache"):
+        st.cache_data.clear()
     
     # Database info
     st.sidebar.markdown("---")
-    st.sidebar.markdown("**Database:** `streaming_data.db`")
-    st.sidebar.markdown("**Table:** `rhodamine`")
+    st.sidebar.markdown(f"**Database:** `{os.path.basename(DATABASE_PATH)}`")
+    st.sidebar.markdown(f"**Table:** `{SCHEMA['table']}`")
     
     # Load data
     with st.spinner("Loading data..."):
@@ -242,16 +430,22 @@ def main():
         st.info("To create sample data, run: `python setup_database.py`")
         return
     
-    # Only show the rho_ppb vs timestamp plot and a simple data table
-    st.subheader("📊 rho_ppb vs Timestamp")
+    # Only show the value vs timestamp plot and a simple data table
+    st.subheader(f"📊 {SCHEMA['value_col']} vs Timestamp")
     time_series_fig = create_time_series_chart(df)
     if time_series_fig:
         st.plotly_chart(time_series_fig, use_container_width=True)
+    stats = load_stats(hours_back)
+    if stats:
+        value_col = SCHEMA['value_col']
+        with st.expander("📈 Statistics"):
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Records", f"{stats['count']}")
+            col2.metric(f"Mean {value_col}", f"{stats['mean']:.2f}")
+            col3.metric(f"Min {value_col}", f"{stats['min']:.2f}")
+            col4.metric(f"Max {value_col}", f"{stats['max']:.2f}")
     with st.expander("📋 Raw Data (Latest 20 records)"):
         st.dataframe(df.tail(20).iloc[::-1], use_container_width=True)
-    if auto_refresh:
-        time.sleep(refresh_interval)
-        st.rerun()
 
 if __name__ == "__main__":
     main()